@@ -7,72 +7,47 @@ Usage:
     python evaluate_results.py
 """
 
+import io
 import json
 import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Tuple
-import re
 
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent / "src"))
 
-def normalize_string(value: str) -> str:
-    """
-    Normalize string for comparison.
-    
-    Normalization steps:
-    - Convert to lowercase
-    - Strip whitespace
-    - Remove common punctuation variations
-    - Normalize date separators
-    """
-    if value is None:
-        return ""
-    
-    # Convert to lowercase and strip
-    normalized = str(value).lower().strip()
-    
-    # Remove extra whitespace
-    normalized = re.sub(r'\s+', ' ', normalized)
-    
-    # Remove commas from numbers
-    normalized = normalized.replace(',', '')
-    
-    # Normalize date separators to single format
-    normalized = normalized.replace('/', '-')
-    normalized = normalized.replace('.', '-')
-    
-    return normalized
-
+from evaluation.normalization import normalize_string, compare_values
 
-def compare_values(extracted, expected) -> bool:
-    """
-    Compare two values with normalization.
-    
-    Returns:
-        True if values match, False otherwise
-    """
-    # Both None/empty = match
-    if (extracted is None or extracted == "") and (expected is None or expected == ""):
-        return True
-    
-    # One None, one not = no match
-    if (extracted is None or extracted == "") or (expected is None or expected == ""):
-        return False
-    
-    # Normalize both to strings
-    extracted_str = normalize_string(str(extracted))
-    expected_str = normalize_string(str(expected))
-    
-    return extracted_str == expected_str
+# orjson is a C-extension JSON parser, 2-5x faster than stdlib json;
+# fall back to stdlib if it isn't installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 def load_ground_truth(path: str) -> List[Dict]:
     """Load ground truth JSON file."""
-    with open(path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    if orjson is not None:
+        entries = orjson.loads(Path(path).read_bytes())
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+
+    # Pre-lowercase filenames once at load so matching never calls
+    # .lower() on the ground-truth side again
+    for entry in entries:
+        entry['_file_name_lower'] = entry.get('file_name', '').lower()
+
+    return entries
 
 
 def load_extracted_result(path: str) -> Dict:
     """Load extracted result JSON file."""
+    if orjson is not None:
+        return orjson.loads(Path(path).read_bytes())
     with open(path, 'r', encoding='utf-8') as f:
         return json.load(f)
 
@@ -89,82 +64,119 @@ def find_ground_truth_by_filename(ground_truth_list: List[Dict], filename: str)
     return None
 
 
-def evaluate_single_file(extracted: Dict, ground_truth_entry: Dict) -> Dict:
+# Field mappings: (extracted_key, ground_truth_key, field_name)
+FIELD_MAPPINGS = [
+    ('invoice_number', 'invoiceNumber', 'Invoice Number'),
+    ('previous_reading_date', 'previousReadingDate', 'Previous Reading Date'),
+    ('current_reading_date', 'presentReadingDate', 'Present Reading Date'),
+]
+
+# Report field name -> key in the extracted result dict
+_FIELD_TO_EXTRACTED_KEY = {
+    'Invoice Number': 'invoice_number',
+    'Previous Reading Date': 'previous_reading_date',
+    'Present Reading Date': 'current_reading_date',
+    'Meter Number': 'meter_number',
+    'Units Consumed': 'units_consumed',
+}
+
+
+def _normalize_ground_truth_entry(ground_truth_entry: Dict) -> Dict[str, Tuple]:
     """
-    Evaluate a single file against its ground truth.
-    
+    Precompute (raw, normalized) value pairs for the evaluated fields.
+
+    Normalizing the ground truth once per entry avoids re-normalizing the
+    same expected values for every comparison in the evaluation loop.
+
     Returns:
-        Dictionary with field-level results and overall accuracy
+        Dictionary mapping field name to (raw_value, normalized_value)
     """
-    field_results = {}
-    correct_count = 0
-    total_count = 0
-    
-    # Define field mappings: (extracted_key, ground_truth_key, field_name)
-    field_mappings = [
-        ('invoice_number', 'invoiceNumber', 'Invoice Number'),
-        ('previous_reading_date', 'previousReadingDate', 'Previous Reading Date'),
-        ('current_reading_date', 'presentReadingDate', 'Present Reading Date'),
-    ]
-    
-    # Evaluate top-level fields
-    for extracted_key, gt_key, field_name in field_mappings:
+    normalized = {}
+
+    # Top-level fields: skip missing/"NA" entries before doing any work
+    for extracted_key, gt_key, field_name in FIELD_MAPPINGS:
         expected_value = ground_truth_entry.get(gt_key)
-        extracted_value = extracted.get(extracted_key)
-        
-        # Only evaluate if ground truth has a value
-        if expected_value and expected_value != "NA":
-            total_count += 1
-            is_correct = compare_values(extracted_value, expected_value)
-            if is_correct:
-                correct_count += 1
-            
-            field_results[field_name] = {
-                'expected': expected_value,
-                'extracted': extracted_value,
-                'correct': is_correct
-            }
-    
-    # Evaluate meter readings (first meter only)
+        if not expected_value or expected_value == "NA":
+            continue
+        normalized[field_name] = (expected_value, normalize_string(expected_value))
+
+    # Meter readings (first meter only)
     meter_readings = ground_truth_entry.get('meterReadings', [])
     if meter_readings and len(meter_readings) > 0:
         first_meter = meter_readings[0]
-        
-        # Meter Number
+
         expected_meter = first_meter.get('meterNumber') or first_meter.get('expected_meter_number')
-        extracted_meter = extracted.get('meter_number')
-        
         if expected_meter:
-            total_count += 1
-            is_correct = compare_values(extracted_meter, expected_meter)
-            if is_correct:
-                correct_count += 1
-            
-            field_results['Meter Number'] = {
-                'expected': expected_meter,
-                'extracted': extracted_meter,
-                'correct': is_correct
-            }
-        
-        # Units Consumed
+            normalized['Meter Number'] = (expected_meter, normalize_string(str(expected_meter)))
+
         expected_units = first_meter.get('unitsConsumed') or first_meter.get('expected_unit_consumption')
-        extracted_units = extracted.get('units_consumed')
-        
         if expected_units:
-            total_count += 1
-            is_correct = compare_values(extracted_units, expected_units)
-            if is_correct:
-                correct_count += 1
-            
-            field_results['Units Consumed'] = {
-                'expected': expected_units,
-                'extracted': extracted_units,
-                'correct': is_correct
-            }
-    
+            normalized['Units Consumed'] = (expected_units, normalize_string(str(expected_units)))
+
+    return normalized
+
+
+def compare_normalized(extracted, expected_norm: str) -> bool:
+    """
+    Compare an extracted value against an already-normalized expected value.
+
+    Only the extracted side is normalized; the expected side was
+    precomputed by _normalize_ground_truth_entry.
+
+    Returns:
+        True if values match, False otherwise
+    """
+    if extracted is None or extracted == "":
+        return False
+
+    extracted_str = str(extracted)
+    if extracted_str == expected_norm:
+        return True
+
+    return normalize_string(extracted_str) == expected_norm
+
+
+def evaluate_single_file(extracted: Dict, ground_truth_entry: Dict, normalized_entry: Dict = None) -> Dict:
+    """
+    Evaluate a single file against its ground truth.
+
+    Args:
+        extracted: Extracted fields dictionary
+        ground_truth_entry: Ground truth entry from JSON
+        normalized_entry: Optional precomputed result of
+            _normalize_ground_truth_entry (computed here if not provided)
+
+    Returns:
+        Dictionary with field-level results and overall accuracy
+    """
+    if normalized_entry is None:
+        normalized_entry = _normalize_ground_truth_entry(ground_truth_entry)
+
+    field_results = {}
+    correct_count = 0
+    total_count = 0
+
+    # Bind lookups once outside the loop
+    extracted_get = extracted.get
+    field_to_key = _FIELD_TO_EXTRACTED_KEY
+
+    for field_name, (expected_value, expected_norm) in normalized_entry.items():
+        extracted_value = extracted_get(field_to_key[field_name])
+
+        total_count += 1
+        is_correct = compare_normalized(extracted_value, expected_norm)
+        if is_correct:
+            correct_count += 1
+
+        field_results[field_name] = {
+            'expected': expected_value,
+            'extracted': extracted_value,
+            'correct': is_correct
+        }
+
     # Calculate overall accuracy
     overall_accuracy = (correct_count / total_count * 100) if total_count > 0 else 0.0
-    
+
     return {
         'overall_accuracy': round(overall_accuracy, 2),
         'correct_fields': correct_count,
@@ -173,82 +185,154 @@ def evaluate_single_file(extracted: Dict, ground_truth_entry: Dict) -> Dict:
     }
 
 
+def evaluate_batch(pairs: List[Tuple[Dict, Dict]]) -> List[Dict]:
+    """
+    Evaluate many (extracted, ground_truth_entry) pairs at once.
+
+    Gathers every field comparison into parallel lists, runs the equality
+    pass in one comprehension (a single C-level loop instead of a Python
+    call chain per field), then scatters results back into per-file
+    accuracy dicts matching evaluate_single_file output.
+
+    Args:
+        pairs: List of (extracted, ground_truth_entry) tuples
+
+    Returns:
+        List of accuracy dicts, one per pair, in input order
+    """
+    file_fields = []   # per file: [(field_name, expected_raw, extracted_raw), ...]
+    expected_norms = []
+    extracted_norms = []
+
+    for extracted, ground_truth_entry in pairs:
+        normalized_entry = _normalize_ground_truth_entry(ground_truth_entry)
+        extracted_get = extracted.get
+        fields = []
+        for field_name, (expected_value, expected_norm) in normalized_entry.items():
+            extracted_value = extracted_get(_FIELD_TO_EXTRACTED_KEY[field_name])
+            fields.append((field_name, expected_value, extracted_value))
+            expected_norms.append(expected_norm)
+            extracted_norms.append(normalize_string(extracted_value))
+        file_fields.append(fields)
+
+    # Single equality pass over all comparisons
+    correct_flags = [x == e for x, e in zip(extracted_norms, expected_norms)]
+
+    results = []
+    flag_idx = 0
+    for fields in file_fields:
+        field_results = {}
+        correct_count = 0
+        for field_name, expected_value, extracted_value in fields:
+            is_correct = correct_flags[flag_idx]
+            flag_idx += 1
+            if is_correct:
+                correct_count += 1
+            field_results[field_name] = {
+                'expected': expected_value,
+                'extracted': extracted_value,
+                'correct': is_correct
+            }
+
+        total_count = len(fields)
+        overall_accuracy = (correct_count / total_count * 100) if total_count > 0 else 0.0
+        results.append({
+            'overall_accuracy': round(overall_accuracy, 2),
+            'correct_fields': correct_count,
+            'total_fields': total_count,
+            'field_results': field_results
+        })
+
+    return results
+
+
 def generate_report(results: List[Dict]) -> str:
     """Generate comprehensive evaluation report."""
-    
-    lines = []
-    lines.append("=" * 100)
-    lines.append("ELECTRICITY BILL EXTRACTION - EVALUATION REPORT")
-    lines.append("=" * 100)
-    lines.append("")
-    
+
+    # Accumulate into a C-level string buffer instead of a list + join
+    buf = io.StringIO()
+    w = buf.write
+
+    w("=" * 100 + "\n")
+    w("ELECTRICITY BILL EXTRACTION - EVALUATION REPORT\n")
+    w("=" * 100 + "\n")
+    w("\n")
+
     # Individual file results
-    lines.append("INDIVIDUAL FILE ACCURACY")
-    lines.append("-" * 100)
-    lines.append("")
-    
+    w("INDIVIDUAL FILE ACCURACY\n")
+    w("-" * 100 + "\n")
+    w("\n")
+
     total_accuracy = 0
     total_files = 0
     total_correct = 0
     total_fields = 0
-    
+
     for result in results:
         if result['status'] == 'evaluated':
             total_files += 1
             total_accuracy += result['accuracy']['overall_accuracy']
             total_correct += result['accuracy']['correct_fields']
             total_fields += result['accuracy']['total_fields']
-            
-            lines.append(f"File: {result['filename']}")
-            lines.append(f"  Accuracy: {result['accuracy']['overall_accuracy']}%")
-            lines.append(f"  Correct Fields: {result['accuracy']['correct_fields']}/{result['accuracy']['total_fields']}")
-            lines.append("")
-            
+
+            w(
+                f"File: {result['filename']}\n"
+                f"  Accuracy: {result['accuracy']['overall_accuracy']}%\n"
+                f"  Correct Fields: {result['accuracy']['correct_fields']}/{result['accuracy']['total_fields']}\n"
+                "\n"
+            )
+
             # Field-level details
             for field_name, field_data in result['accuracy']['field_results'].items():
                 status = "✓" if field_data['correct'] else "✗"
-                lines.append(f"    {status} {field_name}:")
-                lines.append(f"       Expected:  {field_data['expected']}")
-                lines.append(f"       Extracted: {field_data['extracted']}")
-            lines.append("")
-            lines.append("-" * 100)
-            lines.append("")
+                w(
+                    f"    {status} {field_name}:\n"
+                    f"       Expected:  {field_data['expected']}\n"
+                    f"       Extracted: {field_data['extracted']}\n"
+                )
+            w("\n")
+            w("-" * 100 + "\n")
+            w("\n")
         elif result['status'] == 'no_ground_truth':
-            lines.append(f"File: {result['filename']}")
-            lines.append(f"  Status: No ground truth available")
-            lines.append("")
-            lines.append("-" * 100)
-            lines.append("")
+            w(
+                f"File: {result['filename']}\n"
+                f"  Status: No ground truth available\n"
+                "\n"
+            )
+            w("-" * 100 + "\n")
+            w("\n")
         elif result['status'] == 'no_extraction':
-            lines.append(f"File: {result['filename']}")
-            lines.append(f"  Status: No extracted result found")
-            lines.append("")
-            lines.append("-" * 100)
-            lines.append("")
-    
+            w(
+                f"File: {result['filename']}\n"
+                f"  Status: No extracted result found\n"
+                "\n"
+            )
+            w("-" * 100 + "\n")
+            w("\n")
+
     # Overall summary
-    lines.append("")
-    lines.append("=" * 100)
-    lines.append("OVERALL SUMMARY")
-    lines.append("=" * 100)
-    lines.append("")
-    lines.append(f"Total Files Evaluated: {total_files}")
-    lines.append(f"Total Fields Evaluated: {total_fields}")
-    lines.append(f"Total Correct Fields: {total_correct}")
-    lines.append(f"Total Incorrect Fields: {total_fields - total_correct}")
-    lines.append("")
-    
+    w("\n")
+    w("=" * 100 + "\n")
+    w("OVERALL SUMMARY\n")
+    w("=" * 100 + "\n")
+    w("\n")
+    w(f"Total Files Evaluated: {total_files}\n")
+    w(f"Total Fields Evaluated: {total_fields}\n")
+    w(f"Total Correct Fields: {total_correct}\n")
+    w(f"Total Incorrect Fields: {total_fields - total_correct}\n")
+    w("\n")
+
     if total_files > 0:
         avg_accuracy = total_accuracy / total_files
-        lines.append(f"AVERAGE ACCURACY: {avg_accuracy:.2f}%")
-        lines.append(f"FIELD-LEVEL ACCURACY: {(total_correct / total_fields * 100):.2f}%")
+        w(f"AVERAGE ACCURACY: {avg_accuracy:.2f}%\n")
+        w(f"FIELD-LEVEL ACCURACY: {(total_correct / total_fields * 100):.2f}%\n")
     else:
-        lines.append("AVERAGE ACCURACY: N/A (no files evaluated)")
-    
-    lines.append("")
-    lines.append("=" * 100)
-    
-    return "\n".join(lines)
+        w("AVERAGE ACCURACY: N/A (no files evaluated)\n")
+
+    w("\n")
+    w("=" * 100)
+
+    return buf.getvalue()
 
 
 def main():
@@ -272,37 +356,58 @@ def main():
     ground_truth_list = load_ground_truth(str(ground_truth_path))
     print(f"✓ Loaded {len(ground_truth_list)} ground truth entries\n")
     
-    # Process each ground truth entry
-    results = []
-    
-    for gt_entry in ground_truth_list:
-        filename = gt_entry['file_name']
-        base_name = Path(filename).stem
-        
-        # Look for extracted file
-        extracted_file = output_dir / f"{base_name}_extracted.json"
-        
-        if not extracted_file.exists():
-            print(f"⚠ No extraction found for: {filename}")
-            results.append({
+    # One directory scan instead of a stat() syscall per ground-truth entry
+    if output_dir.is_dir():
+        extracted_files = {entry.name for entry in os.scandir(output_dir)
+                           if entry.name.endswith('_extracted.json')}
+    else:
+        extracted_files = set()
+
+    # Submit all extracted-file loads to a thread pool so disk reads and
+    # JSON parsing overlap, then evaluate in ground-truth order
+    load_tasks = []
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for gt_entry in ground_truth_list:
+            filename = gt_entry['file_name']
+            base_name = Path(filename).stem
+
+            # Look for extracted file
+            extracted_name = f"{base_name}_extracted.json"
+
+            if extracted_name in extracted_files:
+                future = executor.submit(load_extracted_result, str(output_dir / extracted_name))
+            else:
+                future = None
+            load_tasks.append((gt_entry, future))
+
+        # Process each ground truth entry; evaluated files are collected
+        # and compared in one batched pass
+        results = []
+        pending = []  # (result_index, extracted, gt_entry)
+
+        for gt_entry, future in load_tasks:
+            filename = gt_entry['file_name']
+
+            if future is None:
+                print(f"⚠ No extraction found for: {filename}")
+                results.append({
+                    'filename': filename,
+                    'status': 'no_extraction'
+                })
+                continue
+
+            results.append(None)  # placeholder filled in after the batch pass
+            pending.append((len(results) - 1, future.result(), gt_entry))
+
+        accuracies = evaluate_batch([(extracted, gt_entry) for _, extracted, gt_entry in pending])
+        for (result_idx, _, gt_entry), accuracy in zip(pending, accuracies):
+            filename = gt_entry['file_name']
+            print(f"✓ Evaluated: {filename} - Accuracy: {accuracy['overall_accuracy']}%")
+            results[result_idx] = {
                 'filename': filename,
-                'status': 'no_extraction'
-            })
-            continue
-        
-        # Load extracted result
-        extracted = load_extracted_result(str(extracted_file))
-        
-        # Evaluate
-        accuracy = evaluate_single_file(extracted, gt_entry)
-        
-        print(f"✓ Evaluated: {filename} - Accuracy: {accuracy['overall_accuracy']}%")
-        
-        results.append({
-            'filename': filename,
-            'status': 'evaluated',
-            'accuracy': accuracy
-        })
+                'status': 'evaluated',
+                'accuracy': accuracy
+            }
     
     # Generate report
     print("\n" + "=" * 100)
@@ -311,17 +416,18 @@ def main():
     
     report = generate_report(results)
     
-    # Save report to file
+    # Save report to file (single buffered write)
     report_path = output_dir / "evaluation_report.txt"
-    with open(report_path, 'w', encoding='utf-8') as f:
-        f.write(report)
-    
+    report_path.write_text(report, encoding='utf-8')
+
     print(f"✓ Report saved to: {report_path}\n")
-    
-    # Save detailed JSON results
+
+    # Save detailed JSON results (single buffered write)
     json_report_path = output_dir / "evaluation_report.json"
-    with open(json_report_path, 'w', encoding='utf-8') as f:
-        json.dump(results, f, indent=2, ensure_ascii=False)
+    if orjson is not None:
+        json_report_path.write_bytes(orjson.dumps(results, option=orjson.OPT_INDENT_2))
+    else:
+        json_report_path.write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding='utf-8')
     
     print(f"✓ Detailed JSON report saved to: {json_report_path}\n")
     
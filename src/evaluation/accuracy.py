@@ -5,6 +5,14 @@ Compares extracted fields with ground truth and calculates accuracy metrics.
 
 from typing import Dict, Tuple, List, Optional
 from .ground_truth_matcher import find_ground_truth_by_filename, transform_ground_truth_to_flat
+from .normalization import normalize_string, compare_values
+
+# Backwards-compatible aliases for the previous module-private names
+_normalize_string = normalize_string
+_compare_values = compare_values
+
+# Sentinel marking a field absent from the extracted dict
+_MISSING = object()
 
 
 def evaluate_accuracy(extracted: dict, ground_truth: dict) -> dict:
@@ -27,15 +35,17 @@ def evaluate_accuracy(extracted: dict, ground_truth: dict) -> dict:
     field_results = {}
     correct_count = 0
     total_count = 0
-    
+
+    extracted_get = extracted.get
+
     # Evaluate each field
     for field, expected_value in ground_truth.items():
-        # Skip fields not in ground truth (shouldn't happen with strict schema)
-        if field not in extracted:
+        # Single lookup per field; sentinel distinguishes a missing key
+        # from an extracted None (shouldn't happen with strict schema)
+        extracted_value = extracted_get(field, _MISSING)
+        if extracted_value is _MISSING:
             continue
         
-        extracted_value = extracted[field]
-        
         # Compare normalized values
         is_correct = _compare_values(extracted_value, expected_value)
         
@@ -93,73 +103,6 @@ def evaluate_accuracy_from_file(extracted: dict, filename: str, ground_truth_lis
     return evaluate_accuracy(extracted, ground_truth_flat)
 
 
-def _compare_values(extracted, expected) -> bool:
-    """
-    Compare two values with normalization.
-    
-    Business Logic:
-    - Both None/null = match
-    - One None, one not = no match
-    - Strings: case-insensitive, whitespace-trimmed, punctuation-normalized
-    - Numbers: string comparison after normalization
-    
-    Args:
-        extracted: Extracted value
-        expected: Expected value
-        
-    Returns:
-        True if values match, False otherwise
-    """
-    # Both None = match
-    if extracted is None and expected is None:
-        return True
-    
-    # One None, one not = no match
-    if extracted is None or expected is None:
-        return False
-    
-    # Normalize both to strings
-    extracted_str = _normalize_string(str(extracted))
-    expected_str = _normalize_string(str(expected))
-    
-    return extracted_str == expected_str
-
-
-def _normalize_string(value: str) -> str:
-    """
-    Normalize string for comparison.
-    
-    Normalization steps:
-    - Convert to lowercase
-    - Strip whitespace
-    - Remove common punctuation variations
-    - Normalize date separators
-    
-    Args:
-        value: String to normalize
-        
-    Returns:
-        Normalized string
-    """
-    import re
-    
-    # Convert to lowercase and strip
-    normalized = value.lower().strip()
-    
-    # Remove extra whitespace
-    normalized = re.sub(r'\s+', ' ', normalized)
-    
-    # Normalize common punctuation
-    normalized = normalized.replace(',', '')  # Remove commas from numbers
-    normalized = normalized.replace('rs.', 'rs')
-    normalized = normalized.replace('₹', 'rs')
-    
-    # Normalize date separators to single format
-    normalized = normalized.replace('/', '-')
-    
-    return normalized
-
-
 def generate_accuracy_report(accuracy_data: dict) -> str:
     """
     Generate human-readable accuracy report.
@@ -4,6 +4,7 @@ Handles loading and matching ground truth data by filename.
 """
 
 import json
+from functools import lru_cache
 from typing import List, Dict, Optional
 from pathlib import Path
 
@@ -19,31 +20,81 @@ def load_ground_truth_file(path: str) -> List[Dict]:
         List of ground truth entries
     """
     with open(path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+        entries = json.load(f)
+
+    # Pre-lowercase filenames once at load so matching never calls
+    # .lower() on the ground-truth side again
+    for entry in entries:
+        entry['_file_name_lower'] = entry.get('file_name', '').lower()
+
+    return entries
+
+
+def build_ground_truth_index(ground_truth_list: List[Dict]) -> Dict[str, Dict]:
+    """
+    Build a lookup index mapping lowercased filenames to ground truth entries.
+
+    Turns the O(N) per-lookup scan into an O(1) dict lookup when matching
+    many files against the same ground truth list.
+
+    Args:
+        ground_truth_list: List of ground truth entries
+
+    Returns:
+        Dictionary mapping lowercased file_name to its entry
+    """
+    index = {}
+    for entry in ground_truth_list:
+        # Use the filename pre-lowercased at load when available
+        key = entry.get('_file_name_lower')
+        if key is None:
+            key = entry.get('file_name', '').lower()
+        # setdefault keeps the first entry on duplicate filenames,
+        # matching the old first-match scan behavior
+        index.setdefault(key, entry)
+    return index
+
+
+# Cache of built indexes keyed by the identity of the ground truth list,
+# so repeated lookups against the same list reuse one index. The value
+# holds the list itself: keeping it alive stops CPython from reusing its
+# id for a different list, and the identity check below catches that.
+_index_cache = {}
+
+
+@lru_cache(maxsize=256)
+def _normalize_filename(filename: str) -> str:
+    """Lowercased base filename, memoized across repeated lookups."""
+    return Path(filename).name.lower()
 
 
 def find_ground_truth_by_filename(ground_truth_list: List[Dict], filename: str) -> Optional[Dict]:
     """
     Find ground truth entry matching the given filename.
-    
-    Performs case-insensitive matching on the base filename.
-    
+
+    Performs case-insensitive matching on the base filename. The ground
+    truth list is indexed once and cached, so repeated calls with the
+    same list are O(1) instead of O(N).
+
     Args:
         ground_truth_list: List of ground truth entries
         filename: Filename to match (e.g., "AJMER-RAJASTHAN.pdf")
-        
+
     Returns:
         Matching ground truth entry or None if not found
     """
     # Extract base filename (with extension)
-    base_filename = Path(filename).name.lower()
-    
-    for entry in ground_truth_list:
-        gt_filename = entry.get('file_name', '').lower()
-        if gt_filename == base_filename:
-            return entry
-    
-    return None
+    base_filename = _normalize_filename(filename)
+
+    cache_key = id(ground_truth_list)
+    cached = _index_cache.get(cache_key)
+    if cached is None or cached[0] is not ground_truth_list:
+        index = build_ground_truth_index(ground_truth_list)
+        _index_cache[cache_key] = (ground_truth_list, index)
+    else:
+        index = cached[1]
+
+    return index.get(base_filename)
 
 
 def transform_ground_truth_to_flat(ground_truth_entry: Dict) -> Dict:
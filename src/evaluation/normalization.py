@@ -0,0 +1,120 @@
+"""
+Shared string normalization and comparison for accuracy evaluation.
+Single implementation used by both the pipeline evaluator and the
+standalone evaluate_results.py script.
+"""
+
+import re
+
+# Precompiled at module load so the hot normalization loop skips the
+# per-call lookup in re's internal pattern cache
+_WS_RE = re.compile(r'\s+')
+
+# Single-pass translation table: drop commas, map date separators to '-'
+# (replaces a chain of str.replace calls that each rescanned the string)
+_NORM_TABLE = str.maketrans({',': None, '/': '-', '.': '-'})
+
+# Byte-level twin of _NORM_TABLE for the ASCII fast path; commas are
+# dropped via the translate delete argument
+_BYTES_TABLE = bytes.maketrans(b'/.', b'--')
+
+# Characters (and the double space marking a whitespace run) that the
+# fast strip/lower comparison cannot settle without full normalization
+_SPECIAL_CHARS = (',', '/', '.', '₹', '\t', '\n', '\r', '  ')
+
+
+def _needs_full_normalization(s: str) -> bool:
+    """True if s contains characters the fast strip/lower compare can't settle."""
+    return any(ch in s for ch in _SPECIAL_CHARS)
+
+
+def normalize_string(value) -> str:
+    """
+    Normalize a value for comparison.
+
+    Normalization steps:
+    - Convert to lowercase
+    - Strip and collapse whitespace
+    - Normalize currency notation (rs. / ₹ -> rs)
+    - Remove commas, normalize date separators
+
+    Args:
+        value: Value to normalize (coerced to string)
+
+    Returns:
+        Normalized string ("" for None)
+    """
+    if value is None:
+        return ""
+
+    # Skip the str() call when the value is already a string (the common
+    # case, since comparators coerce before normalizing)
+    if not isinstance(value, str):
+        value = str(value)
+
+    # ASCII fast path: bytes.translate and bytes.split run as tight C
+    # loops with no regex engine involvement
+    if value.isascii():
+        b = value.encode('ascii').lower().replace(b'rs.', b'rs')
+        b = b.translate(_BYTES_TABLE, delete=b',')
+        # split/join strips the ends and collapses whitespace runs
+        return b' '.join(b.split()).decode('ascii')
+
+    normalized = value.lower().strip()
+
+    # Normalize currency notation before the table maps '.' to '-'
+    normalized = normalized.replace('rs.', 'rs')
+    normalized = normalized.replace('₹', 'rs')
+
+    # Remove commas and normalize date separators in one translate pass
+    normalized = normalized.translate(_NORM_TABLE)
+
+    # Remove extra whitespace; the final strip matches the fast path,
+    # where split/join drops end whitespace exposed by comma deletion
+    normalized = _WS_RE.sub(' ', normalized)
+
+    return normalized.strip()
+
+
+def compare_values(extracted, expected) -> bool:
+    """
+    Compare two values with normalization.
+
+    Business Logic:
+    - Both None/empty = match
+    - One None/empty, one not = no match
+    - Otherwise: exact match after normalization
+
+    Args:
+        extracted: Extracted value
+        expected: Expected value
+
+    Returns:
+        True if values match, False otherwise
+    """
+    # Both None/empty = match
+    if (extracted is None or extracted == "") and (expected is None or expected == ""):
+        return True
+
+    # One None, one not = no match
+    if (extracted is None or extracted == "") or (expected is None or expected == ""):
+        return False
+
+    # Fast path: identical values match without normalization
+    if extracted == expected:
+        return True
+
+    extracted_str = str(extracted)
+    expected_str = str(expected)
+    if extracted_str == expected_str:
+        return True
+
+    # Specialized path: ASCII strings without separator characters or
+    # whitespace runs are fully settled by a C-level strip/lower compare
+    if (extracted_str.isascii() and expected_str.isascii()
+            and not _needs_full_normalization(extracted_str)
+            and not _needs_full_normalization(expected_str)):
+        return extracted_str.strip().lower() == expected_str.strip().lower()
+
+    # Normalize both strings
+    return normalize_string(extracted_str) == normalize_string(expected_str)
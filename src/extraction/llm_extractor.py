@@ -3,9 +3,36 @@ LLM-based field extraction module.
 Uses OpenAI GPT-4o-mini to extract fields that regex may miss.
 """
 
+import asyncio
+import hashlib
 import os
 import json
-from openai import OpenAI
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from openai import OpenAI, AsyncOpenAI, RateLimitError, APIConnectionError
+
+# tiktoken gives exact token counts for truncation; fall back to an
+# approximate character budget if it isn't installed
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# orjson is a C-extension JSON parser, 2-5x faster than stdlib json;
+# fall back to stdlib if it isn't installed. orjson.JSONDecodeError
+# subclasses json.JSONDecodeError, so the except clauses below cover both.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    _json_loads = orjson.loads
+else:
+    _json_loads = json.loads
 
 
 # Strict JSON schema for bill fields
@@ -24,6 +51,454 @@ BILL_SCHEMA = {
     "discom": None
 }
 
+# Field names as a tuple: schema iteration in the hot merge/fill loops
+# hits C-level tuple iteration instead of dict-key iteration
+BILL_FIELDS = tuple(BILL_SCHEMA)
+
+__all__ = [
+    "BILL_SCHEMA",
+    "BILL_FIELDS",
+    "BillFields",
+    "extract_with_llm",
+    "extract_with_llm_batch",
+    "extract_with_llm_batch_offline",
+    "merge_extractions",
+    "merge_extractions_batch",
+]
+
+
+# Token budget for the OCR text portion of the prompt. The extracted
+# fields live on the first page of virtually all bills, so the tail of
+# long multi-page OCR only adds billed tokens and TTFT.
+_MAX_OCR_TOKENS = 1500
+
+_encoding = None
+
+
+def _truncate_ocr_text(ocr_text: str, max_tokens: int = _MAX_OCR_TOKENS) -> str:
+    """
+    Truncate OCR text to a token budget before it reaches the prompt.
+
+    Uses tiktoken for an exact cut when available; otherwise falls back
+    to an approximate 4-characters-per-token budget.
+
+    Args:
+        ocr_text: Full OCR text
+        max_tokens: Maximum tokens to keep
+
+    Returns:
+        OCR text, truncated if it exceeded the budget
+    """
+    global _encoding
+    if tiktoken is not None and _encoding is not False:
+        if _encoding is None:
+            try:
+                _encoding = tiktoken.encoding_for_model("gpt-4o-mini")
+            except KeyError:
+                # Older tiktoken releases know neither the model mapping
+                # nor o200k_base; mark the encoding unusable and fall
+                # through to the character budget
+                try:
+                    _encoding = tiktoken.get_encoding("o200k_base")
+                except ValueError:
+                    _encoding = False
+        if _encoding is not False:
+            tokens = _encoding.encode(ocr_text)
+            if len(tokens) > max_tokens:
+                return _encoding.decode(tokens[:max_tokens])
+            return ocr_text
+
+    # Approximate fallback: ~4 characters per token for mostly-ASCII text
+    max_chars = max_tokens * 4
+    if len(ocr_text) > max_chars:
+        return ocr_text[:max_chars]
+    return ocr_text
+
+
+@dataclass(frozen=True, slots=True)
+class BillFields:
+    """
+    Extracted bill fields as a fixed-slot record.
+
+    A slotted dataclass is several times smaller than the equivalent
+    12-key dict, which matters when thousands of extraction results are
+    held in memory during bulk runs. The per-bill dict API is unchanged;
+    use from_dict/to_dict at the boundary.
+    """
+    invoice_number: Optional[str] = None
+    consumer_name: Optional[str] = None
+    consumer_number: Optional[str] = None
+    meter_number: Optional[str] = None
+    billing_period: Optional[str] = None
+    previous_reading_date: Optional[str] = None
+    current_reading_date: Optional[str] = None
+    units_consumed: Optional[str] = None
+    bill_amount: Optional[str] = None
+    due_date: Optional[str] = None
+    address: Optional[str] = None
+    discom: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "BillFields":
+        """Build a record from an extraction dict (extra keys ignored)."""
+        return cls(**{field: data.get(field) for field in BILL_FIELDS})
+
+    def to_dict(self) -> dict:
+        """Convert back to the schema dict used by logging/evaluation."""
+        return {field: getattr(self, field) for field in BILL_FIELDS}
+
+
+def merge_extractions_batch(regex_results: List[dict], llm_results: List[dict]) -> List[BillFields]:
+    """
+    Merge many regex/LLM result pairs into compact BillFields records.
+
+    Same precedence as merge_extractions (LLM wins, regex fills gaps),
+    but returns slotted records instead of dicts to cut per-record
+    memory during bulk processing.
+
+    Args:
+        regex_results: Regex extraction dicts, one per bill
+        llm_results: LLM extraction dicts, one per bill
+
+    Returns:
+        List of BillFields records, in input order
+    """
+    return [BillFields.from_dict(merge_extractions(regex_result, llm_result))
+            for regex_result, llm_result in zip(regex_results, llm_results)]
+
+
+# Persistent extraction cache: reruns and duplicate pages send identical
+# OCR text, so cache parsed results keyed by a hash of the normalized text
+_CACHE_DIR = Path.home() / ".cache" / "bill_extractor"
+_CACHE_TTL_SECONDS = 30 * 24 * 3600  # 30 days
+
+
+def _cache_key(ocr_text: str) -> str:
+    """SHA-256 of the whitespace-normalized OCR text."""
+    normalized = " ".join(ocr_text.split())
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def _cache_get(key: str) -> Optional[dict]:
+    """Return the cached extraction for key, or None on miss/expiry."""
+    cache_file = _CACHE_DIR / f"{key}.json"
+    try:
+        if time.time() - cache_file.stat().st_mtime > _CACHE_TTL_SECONDS:
+            return None
+        if orjson is not None:
+            return orjson.loads(cache_file.read_bytes())
+        return json.loads(cache_file.read_text(encoding='utf-8'))
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def _cache_put(key: str, result: dict) -> None:
+    """Store an extraction result; cache failures never break extraction."""
+    try:
+        _CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        if orjson is not None:
+            (_CACHE_DIR / f"{key}.json").write_bytes(orjson.dumps(result))
+        else:
+            (_CACHE_DIR / f"{key}.json").write_text(
+                json.dumps(result, ensure_ascii=False), encoding='utf-8'
+            )
+    except OSError:
+        pass
+
+
+# Shared clients: constructing an OpenAI client builds an httpx
+# connection pool and pays TLS setup on first use, so reuse one per
+# process and keep the connection alive across calls
+_sync_client = None
+
+
+def _get_client() -> OpenAI:
+    """Create (once) and return the shared OpenAI client."""
+    global _sync_client
+    if _sync_client is None:
+        api_key = os.getenv('OPENAI_API_KEY')
+        if not api_key:
+            raise Exception(
+                "OPENAI_API_KEY environment variable not set. "
+                "Please set it to your OpenAI API key."
+            )
+        _sync_client = OpenAI(api_key=api_key)
+    return _sync_client
+
+
+def _make_async_client() -> AsyncOpenAI:
+    """
+    Create a fresh AsyncOpenAI client.
+
+    Not cached: httpx binds pooled connections to the event loop of
+    their first use, so a client shared across asyncio.run() calls can
+    hand a later batch a connection from an already-closed loop.
+    Construction is trivially cheap next to a batch of completions.
+    """
+    api_key = os.getenv('OPENAI_API_KEY')
+    if not api_key:
+        raise Exception(
+            "OPENAI_API_KEY environment variable not set. "
+            "Please set it to your OpenAI API key."
+        )
+    return AsyncOpenAI(api_key=api_key)
+
+
+async def _extract_one(client: AsyncOpenAI, ocr_text: str, semaphore: asyncio.Semaphore,
+                       max_retries: int = 5) -> dict:
+    """
+    Extract fields from one bill via the async client.
+
+    Retries with exponential backoff on rate-limit and connection errors
+    so a full batch survives transient API pushback.
+    """
+    # Truncate before hashing so cache keys match the billed prompt
+    ocr_text = _truncate_ocr_text(ocr_text)
+
+    cache_key = _cache_key(ocr_text)
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        return cached
+
+    prompt = _build_extraction_prompt(ocr_text)
+
+    async with semaphore:
+        delay = 1.0
+        for attempt in range(max_retries):
+            try:
+                response = await client.chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=[
+                        {"role": "system", "content": SYSTEM_PREAMBLE},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0,
+                    max_tokens=256,
+                    response_format={"type": "json_object"}
+                )
+                break
+            except (RateLimitError, APIConnectionError):
+                if attempt == max_retries - 1:
+                    raise
+                await asyncio.sleep(delay)
+                delay *= 2
+
+    result_text = response.choices[0].message.content
+
+    try:
+        result = _json_loads(result_text)
+    except json.JSONDecodeError as e:
+        print(f"Warning: LLM returned invalid JSON: {e}")
+        return BILL_SCHEMA.copy()
+
+    # Ensure all expected fields are present
+    for field in BILL_FIELDS:
+        if field not in result:
+            result[field] = None
+
+    _cache_put(cache_key, result)
+    return result
+
+
+def extract_with_llm_batch(ocr_texts: List[str], max_concurrency: int = 8) -> List[dict]:
+    """
+    Extract fields from many bills with concurrent OpenAI calls.
+
+    Business Logic:
+    - One synchronous call per bill pays a full network round-trip each;
+      firing them concurrently hides the RTT behind the slowest call
+    - A semaphore bounds in-flight requests to stay under the account's
+      requests-per-minute tier
+    - Same model/temperature/schema as extract_with_llm
+
+    Args:
+        ocr_texts: OCR text for each bill
+        max_concurrency: Maximum number of in-flight API requests
+
+    Returns:
+        List of extraction dictionaries, in input order
+    """
+    async def _run():
+        # One client per run, closed with the loop it was used on
+        async with _make_async_client() as client:
+            semaphore = asyncio.Semaphore(max_concurrency)
+            tasks = [asyncio.create_task(_extract_one(client, text, semaphore))
+                     for text in ocr_texts]
+            return await asyncio.gather(*tasks)
+
+    return asyncio.run(_run())
+
+
+def extract_with_llm_batch_offline(ocr_texts: List[str], poll_interval: float = 30.0) -> List[dict]:
+    """
+    Extract fields from many bills via the OpenAI Batch API.
+
+    Business Logic:
+    - Batch requests are billed at a 50% discount with a 24-hour
+      completion window, so this is the right path for non-interactive
+      bulk runs (nightly ingest) where latency doesn't matter
+    - Cached bills are answered locally; only misses go into the batch
+    - Same model/temperature/schema as extract_with_llm
+
+    Args:
+        ocr_texts: OCR text for each bill
+        poll_interval: Seconds between batch status polls
+
+    Returns:
+        List of extraction dictionaries, in input order
+    """
+    client = _get_client()
+
+    results: List[Optional[dict]] = [None] * len(ocr_texts)
+    pending = []  # (index, cache_key, truncated text) for cache misses
+
+    for i, ocr_text in enumerate(ocr_texts):
+        ocr_text = _truncate_ocr_text(ocr_text)
+        cache_key = _cache_key(ocr_text)
+        cached = _cache_get(cache_key)
+        if cached is not None:
+            results[i] = cached
+        else:
+            pending.append((i, cache_key, ocr_text))
+
+    if not pending:
+        return results
+
+    # One JSONL line per pending bill; custom_id carries the input index
+    lines = []
+    for i, _, ocr_text in pending:
+        lines.append(json.dumps({
+            "custom_id": f"bill-{i}",
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": "gpt-4o-mini",
+                "messages": [
+                    {"role": "system", "content": SYSTEM_PREAMBLE},
+                    {"role": "user", "content": _build_extraction_prompt(ocr_text)}
+                ],
+                "temperature": 0,
+                "max_tokens": 256,
+                "response_format": {"type": "json_object"}
+            }
+        }, ensure_ascii=False))
+
+    input_file = client.files.create(
+        file=("bill_extraction_batch.jsonl", "\n".join(lines).encode('utf-8')),
+        purpose="batch"
+    )
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+
+    # Poll until the batch reaches a terminal state
+    while batch.status not in ("completed", "failed", "expired", "cancelled"):
+        time.sleep(poll_interval)
+        batch = client.batches.retrieve(batch.id)
+
+    if batch.status != "completed":
+        raise Exception(f"Batch extraction did not complete (status: {batch.status})")
+
+    cache_keys = {i: key for i, key, _ in pending}
+    output = client.files.content(batch.output_file_id)
+    for line in output.text.splitlines():
+        if not line.strip():
+            continue
+        entry = _json_loads(line)
+        index = int(entry["custom_id"].split("-", 1)[1])
+        try:
+            result_text = entry["response"]["body"]["choices"][0]["message"]["content"]
+            result = _json_loads(result_text)
+        except (KeyError, TypeError, json.JSONDecodeError) as e:
+            print(f"Warning: batch entry {entry['custom_id']} unparseable: {e}")
+            results[index] = BILL_SCHEMA.copy()
+            continue
+
+        for field in BILL_FIELDS:
+            if field not in result:
+                result[field] = None
+
+        _cache_put(cache_keys[index], result)
+        results[index] = result
+
+    # Entries missing from the output file (errored requests) fall back
+    # to the empty schema
+    for i, _, _ in pending:
+        if results[i] is None:
+            results[i] = BILL_SCHEMA.copy()
+
+    return results
+
+
+def _stream_response_json(stream):
+    """
+    Accumulate streamed completion chunks, stopping content work as soon
+    as the outer JSON object closes.
+
+    Tracks brace depth while skipping braces inside JSON strings. Once
+    the object is complete, the trailing chunks (including the terminal
+    usage chunk) are drained without content processing: fully consuming
+    the response lets httpx return the connection to the pool instead of
+    tearing it down, and the drained chunks are a handful of bytes.
+
+    Args:
+        stream: Iterable of chat completion chunks (stream=True)
+
+    Returns:
+        Tuple of (response_text, usage or None, model name or None)
+    """
+    parts = []
+    depth = 0
+    in_string = False
+    escape_next = False
+    started = False
+    closed = False
+    usage = None
+    model = None
+
+    try:
+        for chunk in stream:
+            if getattr(chunk, 'usage', None) is not None:
+                usage = chunk.usage
+            if model is None:
+                model = getattr(chunk, 'model', None)
+            if closed or not chunk.choices:
+                continue
+
+            delta = chunk.choices[0].delta.content or ""
+            if not delta:
+                continue
+            parts.append(delta)
+
+            for ch in delta:
+                if escape_next:
+                    escape_next = False
+                    continue
+                if in_string:
+                    if ch == '\\':
+                        escape_next = True
+                    elif ch == '"':
+                        in_string = False
+                    continue
+                if ch == '"':
+                    in_string = True
+                elif ch == '{':
+                    depth += 1
+                    started = True
+                elif ch == '}':
+                    depth -= 1
+                    if started and depth == 0:
+                        # Outer object complete; keep draining for usage
+                        # but skip the per-character scan
+                        closed = True
+                        break
+    finally:
+        stream.close()
+
+    return ''.join(parts), usage, model
+
 
 def extract_with_llm(ocr_text: str, verbose: bool = False, logger=None) -> dict:
     """
@@ -46,22 +521,26 @@ def extract_with_llm(ocr_text: str, verbose: bool = False, logger=None) -> dict:
     Raises:
         Exception: If OpenAI API key is not configured
     """
-    # Verify API key is set
-    api_key = os.getenv('OPENAI_API_KEY')
-    if not api_key:
-        raise Exception(
-            "OPENAI_API_KEY environment variable not set. "
-            "Please set it to your OpenAI API key."
-        )
-    
-    # Initialize OpenAI client
-    client = OpenAI(api_key=api_key)
+    # Truncate before hashing so cache keys match the billed prompt
+    ocr_text = _truncate_ocr_text(ocr_text)
+
+    # Return a cached result for OCR text we've already extracted
+    cache_key = _cache_key(ocr_text)
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        if verbose:
+            print("\nLLM extraction served from cache (no API call)")
+        return cached
+
+    # Reuse the shared OpenAI client (verifies the API key on first use)
+    client = _get_client()
     
-    # Build prompt with strict instructions
+    # Build prompt with strict instructions; the static preamble goes in
+    # the system message so the prompt prefix stays cacheable
     prompt = _build_extraction_prompt(ocr_text)
-    
-    system_message = "You are a precise data extraction assistant. Extract only what is explicitly present in the text. Return valid JSON only."
-    
+
+    system_message = SYSTEM_PREAMBLE
+
     # Log prompt if logger is provided
     if logger:
         logger.log_llm_prompt(system_message, prompt, model="gpt-4o-mini")
@@ -84,8 +563,10 @@ def extract_with_llm(ocr_text: str, verbose: bool = False, logger=None) -> dict:
         print("="*60)
     
     try:
-        # Call GPT-4o-mini with temperature=0 for deterministic output
-        response = client.chat.completions.create(
+        # Call GPT-4o-mini with temperature=0 for deterministic output.
+        # Streaming lets us return as soon as the JSON object closes
+        # instead of waiting for the server to finish the response.
+        stream = client.chat.completions.create(
             model="gpt-4o-mini",
             messages=[
                 {
@@ -98,42 +579,51 @@ def extract_with_llm(ocr_text: str, verbose: bool = False, logger=None) -> dict:
                 }
             ],
             temperature=0,  # Deterministic output
-            response_format={"type": "json_object"}  # Force JSON response
+            max_tokens=256,  # Compact single-line JSON fits well under this
+            response_format={"type": "json_object"},  # Force JSON response
+            stream=True,
+            stream_options={"include_usage": True}
         )
-        
-        # Parse response
-        result_text = response.choices[0].message.content
-        
-        # Log response if logger is provided
-        if logger:
+
+        result_text, usage, model_name = _stream_response_json(stream)
+
+        # Usage only arrives in the terminal chunk, which the early exit
+        # may skip
+        usage_dict = None
+        if usage is not None:
             usage_dict = {
-                "prompt_tokens": response.usage.prompt_tokens,
-                "completion_tokens": response.usage.completion_tokens,
-                "total_tokens": response.usage.total_tokens
+                "prompt_tokens": usage.prompt_tokens,
+                "completion_tokens": usage.completion_tokens,
+                "total_tokens": usage.total_tokens
             }
-            logger.log_llm_response(result_text, usage=usage_dict, model=response.model)
-        
+
+        # Log response if logger is provided
+        if logger:
+            logger.log_llm_response(result_text, usage=usage_dict, model=model_name)
+
         if verbose:
             print("\n" + "="*60)
             print("LLM RESPONSE FROM OPENAI:")
             print("="*60)
-            print(f"Model: {response.model}")
-            print(f"Tokens Used - Prompt: {response.usage.prompt_tokens}, Completion: {response.usage.completion_tokens}, Total: {response.usage.total_tokens}")
+            print(f"Model: {model_name}")
+            if usage_dict:
+                print(f"Tokens Used - Prompt: {usage_dict['prompt_tokens']}, Completion: {usage_dict['completion_tokens']}, Total: {usage_dict['total_tokens']}")
             print("\n" + "-"*60)
             print("Raw Response:")
             print("-"*60)
             print(result_text)
             print("="*60)
         
-        result = json.loads(result_text)
+        result = _json_loads(result_text)
         
         # Ensure all expected fields are present
-        for field in BILL_SCHEMA:
+        for field in BILL_FIELDS:
             if field not in result:
                 result[field] = None
-        
+
+        _cache_put(cache_key, result)
         return result
-        
+
     except json.JSONDecodeError as e:
         print(f"Warning: LLM returned invalid JSON: {e}")
         if verbose:
@@ -144,23 +634,13 @@ def extract_with_llm(ocr_text: str, verbose: bool = False, logger=None) -> dict:
         return BILL_SCHEMA.copy()
 
 
-def _build_extraction_prompt(ocr_text: str) -> str:
-    """
-    Build extraction prompt for LLM with few-shot examples.
-    
-    Business Logic:
-    - Few-shot examples teach LLM the expected extraction pattern
-    - Detailed field descriptions with common label variations
-    - Clear instructions prevent hallucination
-    - Examples from actual Indian electricity bills
-    
-    Args:
-        ocr_text: OCR text to extract from
-        
-    Returns:
-        Formatted prompt string with examples
-    """
-    prompt = f"""You are an expert at extracting structured data from Indian electricity bills.
+# Static preamble sent verbatim as the system message on every call.
+# Keeping it byte-identical (no interpolation, no timestamps) lets
+# OpenAI's automatic prompt-prefix cache reuse it across requests, so
+# only the per-bill OCR text is billed at the uncached rate.
+SYSTEM_PREAMBLE = """You are a precise data extraction assistant. Extract only what is explicitly present in the text. Return valid JSON only.
+
+You are an expert at extracting structured data from Indian electricity bills.
 
 IMPORTANT INSTRUCTIONS:
 1. Extract fields EXACTLY as they appear in the OCR text
@@ -186,20 +666,7 @@ Total Amount: Rs. 5600.00
 Due Date: 22-05-2024
 
 Correct Extraction:
-{{
-  "invoice_number": "12022203035729",
-  "consumer_name": "RAJESH KUMAR",
-  "consumer_number": "0802/0037",
-  "meter_number": "4943282",
-  "billing_period": "May/2024",
-  "previous_reading_date": "30-03-2024",
-  "current_reading_date": "30-04-2024",
-  "units_consumed": "753",
-  "bill_amount": "5600.00",
-  "due_date": "22-05-2024",
-  "address": null,
-  "discom": "AJMER VIDYUT VITRAN NIGAM LTD"
-}}
+{"invoice_number":"12022203035729","consumer_name":"RAJESH KUMAR","consumer_number":"0802/0037","meter_number":"4943282","billing_period":"May/2024","previous_reading_date":"30-03-2024","current_reading_date":"30-04-2024","units_consumed":"753","bill_amount":"5600.00","due_date":"22-05-2024","address":null,"discom":"AJMER VIDYUT VITRAN NIGAM LTD"}
 
 ---
 EXAMPLE 2 - Maharashtra Bill:
@@ -217,20 +684,7 @@ Bill Amount: 3250
 Payment Due: 25-MAY-24
 
 Correct Extraction:
-{{
-  "invoice_number": "000002436874795",
-  "consumer_name": null,
-  "consumer_number": "000002436874795",
-  "meter_number": "06507161895",
-  "billing_period": "MAY-24",
-  "previous_reading_date": "11-APR-24",
-  "current_reading_date": "11-MAY-24",
-  "units_consumed": "486",
-  "bill_amount": "3250",
-  "due_date": "25-MAY-24",
-  "address": null,
-  "discom": "MSEDCL"
-}}
+{"invoice_number":"000002436874795","consumer_name":null,"consumer_number":"000002436874795","meter_number":"06507161895","billing_period":"MAY-24","previous_reading_date":"11-APR-24","current_reading_date":"11-MAY-24","units_consumed":"486","bill_amount":"3250","due_date":"25-MAY-24","address":null,"discom":"MSEDCL"}
 
 ---
 FIELD DESCRIPTIONS & COMMON LABELS:
@@ -276,30 +730,34 @@ FIELD DESCRIPTIONS & COMMON LABELS:
     Common labels: Usually appears at top of bill as company name
     Examples: "MSEDCL", "BESCOM", "TPCODL", "AJMER VIDYUT VITRAN NIGAM LTD"
 
----
+Return a compact single-line JSON object (no indentation or extra whitespace) with exactly these keys, each a string value or null:
+invoice_number, consumer_name, consumer_number, meter_number, billing_period, previous_reading_date, current_reading_date, units_consumed, bill_amount, due_date, address, discom
+"""
+
+
+def _build_extraction_prompt(ocr_text: str) -> str:
+    """
+    Build the per-call user message.
+
+    Business Logic:
+    - All static content (instructions, few-shot examples, field
+      descriptions) lives in SYSTEM_PREAMBLE so the billed prompt prefix
+      is identical across calls
+    - The user message carries only the variable OCR text at the tail
+
+    Args:
+        ocr_text: OCR text to extract from
+
+    Returns:
+        Formatted user message string
+    """
+    return f"""---
 NOW EXTRACT FROM THIS BILL:
 ---
 
 OCR Text:
 {ocr_text}
-
-Return JSON in this exact format:
-{{
-  "invoice_number": null,
-  "consumer_name": null,
-  "consumer_number": null,
-  "meter_number": null,
-  "billing_period": null,
-  "previous_reading_date": null,
-  "current_reading_date": null,
-  "units_consumed": null,
-  "bill_amount": null,
-  "due_date": null,
-  "address": null,
-  "discom": null
-}}
 """
-    return prompt
 
 
 def merge_extractions(regex_result: dict, llm_result: dict) -> dict:
@@ -322,21 +780,8 @@ def merge_extractions(regex_result: dict, llm_result: dict) -> dict:
     Returns:
         Merged dictionary with best results from both
     """
-    merged = {}
-    
-    for field in BILL_SCHEMA:
-        # LLM takes precedence if it found a value
-        llm_value = llm_result.get(field)
-        regex_value = regex_result.get(field)
-        
-        if llm_value is not None and llm_value != "":
-            # Use LLM value
-            merged[field] = llm_value
-        elif regex_value is not None and regex_value != "":
-            # Fall back to regex if LLM didn't find it
-            merged[field] = regex_value
-        else:
-            # Both failed
-            merged[field] = None
-    
-    return merged
+    # Single comprehension instead of a per-field branch cascade: `or`
+    # treats None and "" as missing (matching the old checks), and the
+    # trailing `or None` collapses "both failed" to None
+    return {field: llm_result.get(field) or regex_result.get(field) or None
+            for field in BILL_FIELDS}
@@ -6,6 +6,13 @@ Improves OCR accuracy through grayscale conversion, thresholding, denoising, and
 import cv2
 import numpy as np
 
+# Route the preprocessing pipeline through OpenCV's T-API (UMat) when an
+# OpenCL device is present; probed once at import
+try:
+    _USE_OPENCL = cv2.ocl.haveOpenCL()
+except cv2.error:
+    _USE_OPENCL = False
+
 
 def preprocess_image(image: np.ndarray) -> np.ndarray:
     """
@@ -16,10 +23,10 @@ def preprocess_image(image: np.ndarray) -> np.ndarray:
     - Denoising removes artifacts that confuse OCR
     - Adaptive thresholding handles varying lighting conditions in scanned bills
     - Deskewing corrects rotation from scanning/photography
-    
+
     Processing Pipeline:
     1. Convert to grayscale
-    2. Denoise using bilateral filter (preserves edges)
+    2. Denoise using median blur (skipped for small images)
     3. Apply adaptive thresholding for binarization
     4. Detect and correct skew
     
@@ -29,15 +36,31 @@ def preprocess_image(image: np.ndarray) -> np.ndarray:
     Returns:
         Preprocessed image as numpy array
     """
+    # Steps 1-3 run on a cv2.UMat when an OpenCL device is available:
+    # OpenCV's T-API keeps the intermediates on the device, so the
+    # grayscale/denoise/threshold stages skip the CPU<->DRAM round-trip
+    # between each call. The numpy path below is the fallback.
+    src = cv2.UMat(image) if _USE_OPENCL else image
+    pixel_count = image.shape[0] * image.shape[1]
+
     # Step 1: Convert to grayscale if needed
     if len(image.shape) == 3:
-        gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+        gray = cv2.cvtColor(src, cv2.COLOR_RGB2GRAY)
     else:
-        gray = image.copy()
-    
-    # Step 2: Denoise - bilateral filter preserves edges while removing noise
-    denoised = cv2.bilateralFilter(gray, 9, 75, 75)
-    
+        # No copy needed: every downstream stage writes a fresh output
+        # buffer, so the caller's array is never mutated
+        gray = src
+
+    # Step 2: Denoise - median blur kills the salt-and-pepper noise OCR
+    # cares about at a fraction of the bilateral filter's O(W*H*d^2)
+    # cost; edge preservation barely matters once adaptive thresholding
+    # binarizes the page. Small images carry too little noise to be
+    # worth a pass at all.
+    if pixel_count < 500_000:
+        denoised = gray
+    else:
+        denoised = cv2.medianBlur(gray, 3)
+
     # Step 3: Adaptive thresholding - handles varying lighting across the bill
     # ADAPTIVE_THRESH_GAUSSIAN_C works well for documents
     thresh = cv2.adaptiveThreshold(
@@ -48,13 +71,47 @@ def preprocess_image(image: np.ndarray) -> np.ndarray:
         11,  # Block size
         2    # Constant subtracted from mean
     )
-    
+
+    # Back to host memory for deskew (findNonZero/warpAffine gain little
+    # from the device and downstream code expects an ndarray)
+    if _USE_OPENCL:
+        thresh = thresh.get()
+
     # Step 4: Deskew - correct rotation
     deskewed = deskew_image(thresh)
-    
+
     return deskewed
 
 
+def _quick_skew_estimate(image: np.ndarray):
+    """
+    Cheap skew estimate from dominant Hough line angles.
+
+    Runs on a 4x downscale so an already-aligned page (the common case)
+    can be detected without the full coordinate extraction and rect fit.
+
+    Args:
+        image: Binary image (thresholded)
+
+    Returns:
+        Estimated skew angle in degrees, or None if no confident estimate
+    """
+    small = cv2.resize(image, None, fx=0.25, fy=0.25, interpolation=cv2.INTER_NEAREST)
+    edges = cv2.Canny(small, 50, 150)
+    lines = cv2.HoughLines(edges, 1, np.pi / 180, threshold=120)
+    if lines is None:
+        return None
+
+    # theta is measured from vertical, so pi/2 means a horizontal line;
+    # keep only near-horizontal lines (text rows and table rules)
+    angles = lines[:, 0, 1] - np.pi / 2
+    near_horizontal = angles[np.abs(angles) < np.pi / 4]
+    if len(near_horizontal) == 0:
+        return None
+
+    return float(np.degrees(np.median(near_horizontal)))
+
+
 def deskew_image(image: np.ndarray) -> np.ndarray:
     """
     Detect and correct skew in the image.
@@ -70,13 +127,32 @@ def deskew_image(image: np.ndarray) -> np.ndarray:
     Returns:
         Deskewed image
     """
-    # Find all coordinates of non-zero pixels (text)
-    coords = np.column_stack(np.where(image > 0))
-    
+    # Most scans are already aligned: when the cheap Hough estimate
+    # confidently reads the page as straight, skip the rect fit entirely
+    quick_angle = _quick_skew_estimate(image)
+    if quick_angle is not None and abs(quick_angle) < 0.5:
+        return image
+
+    # Estimate the angle on a 4x-downscaled copy: the minAreaRect angle
+    # is scale-invariant, so this runs on 1/16th of the pixels. Only the
+    # component boundary points matter — minAreaRect fits the convex
+    # hull, and the hull of the external contours equals the hull of
+    # every text pixel — so findContours yields ~100x fewer points than
+    # a full nonzero-coordinate extraction with an identical result.
+    small = cv2.resize(image, None, fx=0.25, fy=0.25, interpolation=cv2.INTER_NEAREST)
+    contours, _ = cv2.findContours(small, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        return image
+    coords = np.vstack(contours)
+
     # If image is mostly empty, return as-is
     if len(coords) < 100:
         return image
-    
+
+    # findContours yields (x, y); the previous np.where stack was (y, x).
+    # Swap back so the minAreaRect angle convention is unchanged.
+    coords = np.ascontiguousarray(coords[..., ::-1])
+
     # Calculate minimum area rectangle around text
     # This gives us the rotation angle
     angle = cv2.minAreaRect(coords)[-1]
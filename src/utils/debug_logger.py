@@ -5,289 +5,377 @@ Captures detailed logs at each stage of the pipeline for debugging and analysis.
 
 import json
 import os
+import traceback
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any
 
+# orjson serializes 3-10x faster than stdlib json and emits UTF-8 bytes
+# directly; fall back to stdlib if it isn't installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Shared separator line for the text sections, built once
+_SEP = "-" * 80 + "\n"
+
+# Raw OCR dumps and LLM prompts routinely exceed the default 8 KiB I/O
+# buffer; a 1 MiB buffer lets each log leave in a single write syscall
+LOG_BUF = 1 << 20
+
+# ASCII record separator prefixing each structured JSON line so the
+# JSON stages can be split back out of the trace unambiguously
+_RS = "\x1e"
+
+# debug_logs roots already created this process, so per-bill setup is a
+# single leaf mkdir instead of re-statting the whole parent chain
+_ROOTS_CREATED: set = set()
+
+
+# Structured stages default to compact JSON (smaller and 30-50% faster
+# to serialize than indented); set DEBUG_PRETTY=1 to read them by eye
+_PRETTY_DEFAULT = os.environ.get("DEBUG_PRETTY") == "1"
+
+
+def _json_bytes(obj, pretty: bool = False) -> bytes:
+    """Serialize obj as UTF-8 JSON (orjson when available)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _json_loads(data):
+    """Parse JSON text/bytes (orjson when available)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _line_count(s: str) -> int:
+    """Line count via a C-level newline scan; splitlines() would build
+    a throwaway list of every line just to take its length."""
+    return s.count("\n") + (0 if not s or s.endswith("\n") else 1)
+
 
 class DebugLogger:
     """
     Comprehensive debug logger for extraction pipeline.
-    Creates structured log files for each processing stage.
+
+    All stages of one bill's processing go into a single append-only
+    ``trace.log``: text stages under ``##### STAGE: ... #####`` headers,
+    structured stages as record-separator-prefixed compact JSON lines.
+    One file handle per bill instead of an open/close per stage.
     """
-    
-    def __init__(self, output_dir: str, filename: str, enabled: bool = True):
+
+    def __new__(cls, output_dir: str, filename: str, enabled: bool = True,
+                pretty: bool = None):
+        # Hand back an inert logger when disabled: its no-op methods cost
+        # one attribute lookup, so the enabled flag is checked once here
+        # instead of at the top of every log call
+        if not enabled and cls is DebugLogger:
+            return super().__new__(_NoopDebugLogger)
+        return super().__new__(cls)
+
+    def __init__(self, output_dir: str, filename: str, enabled: bool = True,
+                 pretty: bool = None):
         """
         Initialize debug logger.
-        
+
         Args:
             output_dir: Base output directory
             filename: Name of the file being processed
             enabled: Whether logging is enabled
+            pretty: Indent structured JSON stages; defaults to the
+                DEBUG_PRETTY environment variable
         """
         self.enabled = enabled
         if not enabled:
             return
-        
-        # Create debug directory structure
+        self.pretty = _PRETTY_DEFAULT if pretty is None else pretty
+
+        # Create debug directory structure: the shared root once per
+        # process, then only the per-bill leaf
         base_name = Path(filename).stem
-        self.debug_dir = Path(output_dir) / "debug_logs" / base_name
-        self.debug_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Initialize metadata
+        root = Path(output_dir) / "debug_logs"
+        if root not in _ROOTS_CREATED:
+            root.mkdir(parents=True, exist_ok=True)
+            _ROOTS_CREATED.add(root)
+        self.debug_dir = root / base_name
+        self.debug_dir.mkdir(exist_ok=True)
+
+        # One binary handle for the whole bill: each stage is encoded to
+        # UTF-8 exactly once (orjson already emits bytes), skipping the
+        # TextIOWrapper's incremental encoder
+        self._log_fp = open(
+            self.debug_dir / "trace.log", 'wb', buffering=LOG_BUF
+        )
+
+        # Initialize metadata; _dirty tracks whether anything was logged
+        # since the last save_metadata so repeated saves become no-ops
         self.metadata = {
             "filename": filename,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": self._now(),
             "stages": {}
         }
-    
+        self._dirty = True
+
+    @staticmethod
+    def _now() -> str:
+        """Current timestamp for log payloads, formatted once per call site."""
+        return datetime.now().isoformat(timespec='seconds')
+
+    def _stage(self, name: str, payload: str) -> None:
+        """Append one delimited stage section to the trace."""
+        self._log_fp.write(f"\n##### STAGE: {name} #####\n{payload}\n".encode('utf-8'))
+
+    def _stage_json(self, name: str, obj: Dict) -> None:
+        """Append one structured stage as a JSON record."""
+        self._log_fp.write(
+            f"\n##### STAGE: {name} #####\n{_RS}".encode('utf-8')
+            + _json_bytes(obj, self.pretty) + b"\n"
+        )
+
     def log_raw_ocr(self, ocr_text: str, confidence: float = None):
         """
         Log raw OCR output.
-        
+
         Args:
             ocr_text: Raw OCR text
             confidence: Optional OCR confidence score
         """
-        if not self.enabled:
-            return
-        
-        log_file = self.debug_dir / "01_raw_ocr.txt"
-        with open(log_file, 'w', encoding='utf-8') as f:
-            f.write("="*80 + "\n")
-            f.write("RAW OCR OUTPUT\n")
-            f.write("="*80 + "\n\n")
-            
-            if confidence is not None:
-                f.write(f"Confidence Score: {confidence:.2f}%\n")
-                f.write("-"*80 + "\n\n")
-            
-            f.write(f"Character Count: {len(ocr_text)}\n")
-            f.write(f"Line Count: {len(ocr_text.splitlines())}\n")
-            f.write("-"*80 + "\n\n")
-            
-            f.write("Full Text:\n")
-            f.write("-"*80 + "\n")
-            f.write(ocr_text)
-            f.write("\n" + "="*80 + "\n")
-        
+        line_count = _line_count(ocr_text)
+        confidence_block = (
+            f"Confidence Score: {confidence:.2f}%\n{_SEP}\n"
+            if confidence is not None else ""
+        )
+        self._stage("RAW OCR", (
+            f"{confidence_block}"
+            f"Character Count: {len(ocr_text)}\n"
+            f"Line Count: {line_count}\n{_SEP}\n"
+            f"Full Text:\n{_SEP}{ocr_text}"
+        ))
+
         self.metadata["stages"]["raw_ocr"] = {
             "char_count": len(ocr_text),
-            "line_count": len(ocr_text.splitlines()),
+            "line_count": line_count,
             "confidence": confidence
         }
-    
+        self._dirty = True
+
     def log_cleaned_ocr(self, cleaned_text: str):
         """
         Log cleaned/preprocessed OCR text.
-        
+
         Args:
             cleaned_text: Cleaned OCR text
         """
-        if not self.enabled:
-            return
-        
-        log_file = self.debug_dir / "02_cleaned_ocr.txt"
-        with open(log_file, 'w', encoding='utf-8') as f:
-            f.write("="*80 + "\n")
-            f.write("CLEANED OCR OUTPUT (Post-Processing)\n")
-            f.write("="*80 + "\n\n")
-            
-            f.write(f"Character Count: {len(cleaned_text)}\n")
-            f.write(f"Line Count: {len(cleaned_text.splitlines())}\n")
-            f.write("-"*80 + "\n\n")
-            
-            f.write("Full Text:\n")
-            f.write("-"*80 + "\n")
-            f.write(cleaned_text)
-            f.write("\n" + "="*80 + "\n")
-        
+        line_count = _line_count(cleaned_text)
+        self._stage("CLEANED OCR", (
+            f"Character Count: {len(cleaned_text)}\n"
+            f"Line Count: {line_count}\n{_SEP}\n"
+            f"Full Text:\n{_SEP}{cleaned_text}"
+        ))
+
         self.metadata["stages"]["cleaned_ocr"] = {
             "char_count": len(cleaned_text),
-            "line_count": len(cleaned_text.splitlines())
+            "line_count": line_count
         }
-    
+        self._dirty = True
+
     def log_regex_extraction(self, regex_result: Dict):
         """
         Log regex extraction results.
-        
+
         Args:
             regex_result: Dictionary of regex extraction results
         """
-        if not self.enabled:
-            return
-        
-        log_file = self.debug_dir / "03_regex_extraction.json"
-        with open(log_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                "stage": "Regex Extraction",
-                "timestamp": datetime.now().isoformat(),
-                "results": regex_result,
-                "fields_found": sum(1 for v in regex_result.values() if v is not None),
-                "total_fields": len(regex_result)
-            }, f, indent=2, ensure_ascii=False)
-        
+        # Count once; the same numbers go to the JSON payload and metadata
+        found = sum(1 for v in regex_result.values() if v is not None)
+        total = len(regex_result)
+
+        self._stage_json("REGEX EXTRACTION", {
+            "stage": "Regex Extraction",
+            "timestamp": self._now(),
+            "results": regex_result,
+            "fields_found": found,
+            "total_fields": total
+        })
+
         self.metadata["stages"]["regex_extraction"] = {
-            "fields_found": sum(1 for v in regex_result.values() if v is not None),
-            "total_fields": len(regex_result)
+            "fields_found": found,
+            "total_fields": total
         }
-    
+        self._dirty = True
+
     def log_llm_prompt(self, system_message: str, user_prompt: str, model: str = "gpt-4o-mini"):
         """
         Log complete LLM prompt sent to OpenAI.
-        
+
         Args:
             system_message: System message
             user_prompt: User prompt with OCR text
             model: Model name
         """
-        if not self.enabled:
-            return
-        
-        log_file = self.debug_dir / "04_llm_prompt.txt"
-        with open(log_file, 'w', encoding='utf-8') as f:
-            f.write("="*80 + "\n")
-            f.write("LLM PROMPT SENT TO OPENAI\n")
-            f.write("="*80 + "\n\n")
-            
-            f.write(f"Model: {model}\n")
-            f.write(f"Temperature: 0\n")
-            f.write(f"Response Format: JSON\n")
-            f.write(f"Timestamp: {datetime.now().isoformat()}\n")
-            f.write("-"*80 + "\n\n")
-            
-            f.write("SYSTEM MESSAGE:\n")
-            f.write("-"*80 + "\n")
-            f.write(system_message)
-            f.write("\n\n" + "-"*80 + "\n\n")
-            
-            f.write("USER PROMPT:\n")
-            f.write("-"*80 + "\n")
-            f.write(user_prompt)
-            f.write("\n\n" + "="*80 + "\n")
-        
+        ts = self._now()
+        self._stage("LLM PROMPT", (
+            f"Model: {model}\n"
+            f"Temperature: 0\n"
+            f"Response Format: JSON\n"
+            f"Timestamp: {ts}\n{_SEP}\n"
+            f"SYSTEM MESSAGE:\n{_SEP}{system_message}\n\n{_SEP}\n"
+            f"USER PROMPT:\n{_SEP}{user_prompt}"
+        ))
+
         self.metadata["stages"]["llm_prompt"] = {
             "model": model,
             "prompt_length": len(user_prompt),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": ts
         }
-    
+        self._dirty = True
+
     def log_llm_response(self, response_text: str, usage: Dict = None, model: str = None):
         """
         Log LLM response from OpenAI.
-        
+
         Args:
             response_text: Raw response text (JSON)
             usage: Token usage statistics
             model: Model used
         """
-        if not self.enabled:
-            return
-        
-        log_file = self.debug_dir / "05_llm_response.json"
-        
-        # Parse response if it's JSON string
+        # Parse response if it's JSON text; ValueError covers both
+        # orjson.JSONDecodeError and json.JSONDecodeError without
+        # swallowing interrupts the way a bare except did
         try:
-            response_data = json.loads(response_text) if isinstance(response_text, str) else response_text
-        except:
+            response_data = _json_loads(response_text) if isinstance(response_text, (str, bytes)) else response_text
+        except ValueError:
             response_data = {"raw_text": response_text}
-        
-        with open(log_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                "stage": "LLM Response",
-                "timestamp": datetime.now().isoformat(),
-                "model": model,
-                "usage": usage,
-                "response": response_data
-            }, f, indent=2, ensure_ascii=False)
-        
+
+        ts = self._now()
+        self._stage_json("LLM RESPONSE", {
+            "stage": "LLM Response",
+            "timestamp": ts,
+            "model": model,
+            "usage": usage,
+            "response": response_data
+        })
+
         self.metadata["stages"]["llm_response"] = {
             "model": model,
             "usage": usage,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": ts
         }
-    
+        self._dirty = True
+
     def log_final_extraction(self, final_result: Dict):
         """
         Log final merged extraction results.
-        
+
         Args:
             final_result: Final extraction dictionary
         """
-        if not self.enabled:
-            return
-        
-        log_file = self.debug_dir / "06_final_extraction.json"
-        with open(log_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                "stage": "Final Extraction (Merged)",
-                "timestamp": datetime.now().isoformat(),
-                "results": final_result,
-                "fields_found": sum(1 for v in final_result.values() if v is not None),
-                "total_fields": len(final_result)
-            }, f, indent=2, ensure_ascii=False)
-        
+        found = sum(1 for v in final_result.values() if v is not None)
+        total = len(final_result)
+
+        self._stage_json("FINAL EXTRACTION", {
+            "stage": "Final Extraction (Merged)",
+            "timestamp": self._now(),
+            "results": final_result,
+            "fields_found": found,
+            "total_fields": total
+        })
+
         self.metadata["stages"]["final_extraction"] = {
-            "fields_found": sum(1 for v in final_result.values() if v is not None),
-            "total_fields": len(final_result)
+            "fields_found": found,
+            "total_fields": total
         }
-    
+        self._dirty = True
+
     def log_accuracy_evaluation(self, accuracy_data: Dict):
         """
         Log accuracy evaluation results.
-        
+
         Args:
             accuracy_data: Accuracy evaluation dictionary
         """
-        if not self.enabled:
-            return
-        
-        log_file = self.debug_dir / "07_accuracy_evaluation.json"
-        with open(log_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                "stage": "Accuracy Evaluation",
-                "timestamp": datetime.now().isoformat(),
-                "evaluation": accuracy_data
-            }, f, indent=2, ensure_ascii=False)
-        
+        self._stage_json("ACCURACY EVALUATION", {
+            "stage": "Accuracy Evaluation",
+            "timestamp": self._now(),
+            "evaluation": accuracy_data
+        })
+
         if accuracy_data:
             self.metadata["stages"]["accuracy_evaluation"] = {
                 "overall_accuracy": accuracy_data.get("overall_accuracy"),
                 "correct_fields": accuracy_data.get("correct_fields"),
                 "total_fields": accuracy_data.get("total_fields")
             }
-    
+        self._dirty = True
+
     def save_metadata(self):
-        """Save processing metadata summary."""
-        if not self.enabled:
+        """Append the processing metadata summary to the trace."""
+        if not self._dirty:
             return
-        
-        metadata_file = self.debug_dir / "00_metadata.json"
-        with open(metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(self.metadata, f, indent=2, ensure_ascii=False)
-    
+        self._stage_json("METADATA", self.metadata)
+        self._dirty = False
+
     def log_error(self, stage: str, error: Exception):
         """
         Log error that occurred during processing.
-        
+
         Args:
             stage: Stage where error occurred
             error: Exception object
         """
-        if not self.enabled:
-            return
-        
-        error_file = self.debug_dir / "ERROR.txt"
-        with open(error_file, 'a', encoding='utf-8') as f:
-            f.write("="*80 + "\n")
-            f.write(f"ERROR in {stage}\n")
-            f.write("="*80 + "\n")
-            f.write(f"Timestamp: {datetime.now().isoformat()}\n")
-            f.write(f"Error Type: {type(error).__name__}\n")
-            f.write(f"Error Message: {str(error)}\n")
-            f.write("-"*80 + "\n\n")
-            
-            import traceback
-            f.write("Traceback:\n")
-            f.write(traceback.format_exc())
-            f.write("\n" + "="*80 + "\n\n")
+        fp = self._log_fp
+        fp.write((
+            f"\n##### STAGE: ERROR ({stage}) #####\n"
+            f"Timestamp: {self._now()}\n"
+            f"Error Type: {type(error).__name__}\n"
+            f"Error Message: {str(error)}\n{_SEP}\n"
+            f"Traceback:\n"
+        ).encode('utf-8'))
+        # Stream the formatted frames into the buffered trace instead of
+        # joining them into one throwaway string first; formatting from
+        # the exception object also works outside an except block
+        for line in traceback.TracebackException.from_exception(error).format():
+            fp.write(line.encode('utf-8'))
+        fp.write(b"\n")
+
+    def close(self):
+        """Flush and close the trace file."""
+        self._log_fp.close()
+
+    def __del__(self):
+        # Fallback for callers that never reach close(); the buffered
+        # trace would otherwise only flush at interpreter shutdown
+        fp = getattr(self, '_log_fp', None)
+        if fp is not None and not fp.closed:
+            fp.close()
+
+
+def _noop(self, *args, **kwargs):
+    return None
+
+
+class _NoopDebugLogger(DebugLogger):
+    """Inert logger returned by DebugLogger(..., enabled=False)."""
+
+    enabled = False
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    log_raw_ocr = _noop
+    log_cleaned_ocr = _noop
+    log_regex_extraction = _noop
+    log_llm_prompt = _noop
+    log_llm_response = _noop
+    log_final_extraction = _noop
+    log_accuracy_evaluation = _noop
+    save_metadata = _noop
+    log_error = _noop
+    close = _noop
@@ -4,46 +4,135 @@ Converts PDFs to images and loads image files.
 """
 
 import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import List
-from pdf2image import convert_from_path
+import cv2
 from PIL import Image
 import numpy as np
 
+# PyMuPDF renders PDF pages in-process straight into a native buffer,
+# avoiding pdf2image's pdftoppm subprocess + temp-file + PIL round-trip;
+# fall back to pdf2image if it isn't installed
+try:
+    import fitz
+except ImportError:
+    fitz = None
+    from pdf2image import convert_from_path
 
-def load_file(file_path: str) -> List[np.ndarray]:
+# Rasterization resolution for PDF pages (matches pdf2image's default)
+_PDF_DPI = 200
+
+# Directories save_json has already created this run
+_created_dirs: set = set()
+
+
+def _pil_to_numpy(img: Image.Image) -> np.ndarray:
+    """
+    Convert a PIL image to a numpy array without PIL's array protocol.
+
+    np.array(img) goes through PIL's array-interface protocol and an
+    extra intermediate buffer; tobytes() + frombuffer + copy keeps it to
+    two C-level copies. The copy also makes the result writable — a
+    frombuffer view over bytes is read-only, which would break any
+    in-place OpenCV call downstream.
+    """
+    channels = len(img.getbands())
+    shape = (img.height, img.width, channels) if channels > 1 else (img.height, img.width)
+    return np.frombuffer(img.tobytes(), dtype=np.uint8).reshape(shape).copy()
+
+
+def _render_pdf_page(file_path: str, page_index: int) -> np.ndarray:
+    """
+    Render one PDF page to an RGB numpy array with PyMuPDF.
+
+    Opens its own document handle: PyMuPDF documents are not safe to
+    share across threads, but rendering itself releases the GIL, so
+    per-thread handles let pages rasterize in parallel.
+    """
+    matrix = fitz.Matrix(_PDF_DPI / 72, _PDF_DPI / 72)
+    with fitz.open(file_path) as doc:
+        pix = doc[page_index].get_pixmap(matrix=matrix, alpha=False)
+    # np.frombuffer is a zero-copy view over the pixmap samples
+    return np.ascontiguousarray(
+        np.frombuffer(pix.samples, dtype=np.uint8)
+        .reshape(pix.height, pix.width, pix.n)
+    )
+
+# orjson serializes/parses several times faster than stdlib json; fall
+# back to stdlib if it isn't installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def load_file(file_path: str, thread_count: int = 1) -> List[np.ndarray]:
     """
     Load a file (PDF or image) and return a list of images as numpy arrays.
-    
+
     Business Logic:
-    - PDFs may have multiple pages, each converted to an image
+    - PDFs may have multiple pages, each converted to an image;
+      thread_count > 1 lets pdftoppm rasterize pages in parallel
     - Images are returned as-is in a single-element list
     - All outputs are normalized to numpy arrays for consistent processing
-    
+
     Args:
         file_path: Path to the input file (PDF or image)
-        
+        thread_count: Worker threads for PDF page rasterization
+
     Returns:
         List of images as numpy arrays (one per page for PDFs)
-        
+
     Raises:
         ValueError: If file format is unsupported
         FileNotFoundError: If file doesn't exist
     """
-    if not os.path.exists(file_path):
-        raise FileNotFoundError(f"File not found: {file_path}")
-    
+    # A single stat doubles as the existence check, instead of an
+    # os.path.exists stat followed by the opener's own stat
+    try:
+        os.stat(file_path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"File not found: {file_path}") from None
+
     file_ext = os.path.splitext(file_path)[1].lower()
-    
+
     # Handle PDF files - convert each page to image
     if file_ext == '.pdf':
-        images = convert_from_path(file_path)
+        if fitz is not None:
+            with fitz.open(file_path) as doc:
+                n_pages = doc.page_count
+
+            # Rasterization releases the GIL, so multi-page bills render
+            # near-linearly faster across threads
+            workers = min(max(thread_count, 1), n_pages)
+            if workers > 1:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    return list(executor.map(
+                        _render_pdf_page, [file_path] * n_pages, range(n_pages)
+                    ))
+            return [_render_pdf_page(file_path, i) for i in range(n_pages)]
+
+        images = convert_from_path(file_path, thread_count=thread_count)
         # Convert PIL images to numpy arrays
-        return [np.array(img) for img in images]
+        return [_pil_to_numpy(img) for img in images]
     
     # Handle image files (jpg, jpeg, png)
-    elif file_ext in ['.jpg', '.jpeg', '.png']:
+    elif file_ext in ('.jpg', '.jpeg', '.png'):
+        # cv2.imread decodes straight into a numpy array, skipping the
+        # PIL object + np.array copy; convert BGR to the RGB layout the
+        # rest of the pipeline expects
+        arr = cv2.imread(file_path, cv2.IMREAD_UNCHANGED)
+        if arr is not None:
+            if arr.ndim == 3 and arr.shape[2] == 3:
+                arr = cv2.cvtColor(arr, cv2.COLOR_BGR2RGB)
+            elif arr.ndim == 3 and arr.shape[2] == 4:
+                arr = cv2.cvtColor(arr, cv2.COLOR_BGRA2RGBA)
+            return [arr]
+
+        # Fall back to PIL for files cv2 can't decode
         img = Image.open(file_path)
-        return [np.array(img)]
+        return [_pil_to_numpy(img)]
     
     else:
         raise ValueError(f"Unsupported file format: {file_ext}")
@@ -57,13 +146,19 @@ def save_json(data: dict, output_path: str) -> None:
         data: Dictionary to save
         output_path: Path where JSON will be saved
     """
-    import json
-    
-    # Ensure output directory exists
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    # Ensure output directory exists; remember directories already made
+    # so repeated saves into the same folder skip the stat+mkdir syscalls
+    directory = os.path.dirname(output_path)
+    if directory not in _created_dirs:
+        os.makedirs(directory, exist_ok=True)
+        _created_dirs.add(directory)
+
+    if orjson is not None:
+        Path(output_path).write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        import json
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
 
 
 def load_json(file_path: str) -> dict:
@@ -76,7 +171,9 @@ def load_json(file_path: str) -> dict:
     Returns:
         Dictionary from JSON file
     """
+    if orjson is not None:
+        return orjson.loads(Path(file_path).read_bytes())
+
     import json
-    
     with open(file_path, 'r', encoding='utf-8') as f:
         return json.load(f)